@@ -2,61 +2,119 @@
 FastAPI endpoints for the Animal API.
 """
 
+import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import aiohttp
-from fastapi import HTTPException
+import orjson
+from fastapi import HTTPException, Request, Response
 
 from ..core.config import config, logger
 from ..services.animal_service import process_all_animals_batch
 
-
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": config.APP_VERSION,
-        "service": config.APP_TITLE,
-    }
+# animal_id -> (expiry on the monotonic clock, details), least recently used first
+_DETAIL_CACHE: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _cached_details(animal_id: int) -> Optional[Dict[str, Any]]:
+    """Return unexpired cached details for an animal, if any."""
+    entry = _DETAIL_CACHE.get(animal_id)
+    if entry is None:
+        return None
+    expires_at, details = entry
+    if expires_at < time.monotonic():
+        del _DETAIL_CACHE[animal_id]
+        return None
+    _DETAIL_CACHE.move_to_end(animal_id)
+    return details
+
+
+def _cache_details(animal_id: int, details: Dict[str, Any]) -> None:
+    """Remember details for an animal, evicting the least recently used entry."""
+    if config.ANIMAL_DETAIL_CACHE_TTL <= 0:
+        return
+    _DETAIL_CACHE[animal_id] = (
+        time.monotonic() + config.ANIMAL_DETAIL_CACHE_TTL,
+        details,
+    )
+    _DETAIL_CACHE.move_to_end(animal_id)
+    if len(_DETAIL_CACHE) > config.ANIMAL_DETAIL_CACHE_SIZE:
+        _DETAIL_CACHE.popitem(last=False)
+
+
+def get_session(request: Request) -> aiohttp.ClientSession:
+    """Return the application-wide HTTP session created in the lifespan handler."""
+    return request.app.state.session
+
+
+# Serialized health payload and the wall-clock second it was built in
+_HEALTH_BODY = b""
+_HEALTH_SECOND = -1
+
+
+async def health_check() -> Response:
+    """Health check endpoint; the payload is re-serialized at most once a second."""
+    global _HEALTH_BODY, _HEALTH_SECOND
+    second = int(time.time())
+    if second != _HEALTH_SECOND:
+        _HEALTH_BODY = orjson.dumps(
+            {
+                "status": "healthy",
+                "timestamp": datetime.fromtimestamp(second).isoformat(),
+                "version": config.APP_VERSION,
+                "service": config.APP_TITLE,
+            }
+        )
+        _HEALTH_SECOND = second
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
-async def get_animals(page: Optional[int] = 1):
+async def get_animals(session: aiohttp.ClientSession, page: Optional[int] = 1):
     """Get paginated list of animals."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{config.ANIMALS_API_BASE_URL}/animals/v1/animals?page={page}"
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                raise HTTPException(
-                    status_code=response.status, detail="Failed to fetch animals"
-                )
+        async with session.get(
+            f"{config.ANIMALS_API_BASE_URL}/animals/v1/animals?page={page}"
+        ) as response:
+            if response.status == 200:
+                return orjson.loads(await response.read())
+            raise HTTPException(
+                status_code=response.status, detail="Failed to fetch animals"
+            )
     except aiohttp.ClientError as e:
         raise HTTPException(status_code=500, detail=f"Connection error: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
-async def get_animal_details(animal_id: int):
-    """Get detailed information for a specific animal."""
+async def get_animal_details(session: aiohttp.ClientSession, animal_id: int):
+    """Get detailed information for a specific animal.
+
+    Successful lookups are cached for ANIMAL_DETAIL_CACHE_TTL seconds so
+    repeated requests skip the upstream round trip.
+    """
+    cached = _cached_details(animal_id)
+    if cached is not None:
+        return cached
+
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{config.ANIMALS_API_BASE_URL}/animals/v1/animals/{animal_id}"
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                if response.status == 404:
-                    raise HTTPException(
-                        status_code=404, detail=f"Animal with ID {animal_id} not found"
-                    )
+        async with session.get(
+            f"{config.ANIMALS_API_BASE_URL}/animals/v1/animals/{animal_id}"
+        ) as response:
+            if response.status == 200:
+                details = orjson.loads(await response.read())
+                _cache_details(animal_id, details)
+                return details
+            if response.status == 404:
                 raise HTTPException(
-                    status_code=response.status,
-                    detail="Failed to fetch animal details",
+                    status_code=404, detail=f"Animal with ID {animal_id} not found"
                 )
+            raise HTTPException(
+                status_code=response.status,
+                detail="Failed to fetch animal details",
+            )
     except aiohttp.ClientError as e:
         raise HTTPException(status_code=500, detail=f"Connection error: {str(e)}")
     except HTTPException:
@@ -65,46 +123,56 @@ async def get_animal_details(animal_id: int):
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+def _check_batch_size(count: int) -> None:
+    """Raise a 400 if a batch holds more animals than allowed."""
+    if count > config.MAX_ANIMALS_PER_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {config.MAX_ANIMALS_PER_BATCH} animals per batch",
+        )
+
+
+async def limit_batch_size(request: Request) -> None:
+    """Reject oversized batches from the decoded body before it is validated."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return  # Not JSON; leave the error to body validation
+    if isinstance(body, list):
+        _check_batch_size(len(body))
+
+
 async def receive_animals(animals: List[Dict[str, Any]]):
     """Receive and process animal data batches."""
-    try:
-        if len(animals) > config.MAX_ANIMALS_PER_BATCH:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Maximum {config.MAX_ANIMALS_PER_BATCH} animals per batch",
-            )
-        logger.info(f"Received batch of {len(animals)} animals")
-        for animal in animals:
-            logger.info(f"Processing animal: {animal.get('id', 'unknown')}")
-
-        return {
-            "message": f"Successfully received {len(animals)} animals",
-            "count": len(animals),
-        }
-    except HTTPException:
-        raise  # Re-raise HTTPExceptions without wrapping them
-    except Exception as e:
-        logger.error(f"Error processing animals: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error processing animals: {str(e)}"
+    count = len(animals)
+    _check_batch_size(count)
+
+    logger.info("Received batch of %d animals", count)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Processing animals: %s", [a.get("id", "unknown") for a in animals]
         )
 
+    return {
+        "message": f"Successfully received {count} animals",
+        "count": count,
+    }
+
 
-async def process_all_animals():
-    """Process all animals using ETL principles:
-    Extract batches -> Transform -> Load -> repeat.
+async def process_all_animals(session: aiohttp.ClientSession):
+    """Process all animals using a pipelined ETL:
+    Extract -> Transform -> Load, with all three stages running concurrently.
 
     This endpoint follows proper ETL patterns by:
     1. Extracting animal IDs in pages from /animals/v1/animals
-    2. Processing each page in batches of MAX_ANIMALS_PER_BATCH (100)
-    3. For each batch: Transform animals in parallel using /animals/v1/animals/{id}
-    4. Load the transformed batch to /animals/v1/home
-    5. Repeat until all animals are processed
+    2. Transforming animals in parallel using /animals/v1/animals/{id}
+    3. Grouping transformed animals in batches of MAX_ANIMALS_PER_BATCH (100)
+    4. Loading each batch to /animals/v1/home as soon as it is full
 
-    This approach ensures constant memory usage and better error isolation.
+    Bounded queues between the stages keep memory usage constant.
     """
     try:
-        return await process_all_animals_batch(config.ANIMALS_API_BASE_URL)
+        return await process_all_animals_batch(session, config.ANIMALS_API_BASE_URL)
     except Exception as e:
-        logger.error(f"Error in process_all_animals: {e}")
+        logger.error("Error in process_all_animals: %s", e)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
@@ -5,8 +5,11 @@ Application configuration settings.
 import logging
 import os
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# Setup logging (set LOG_LEVEL=WARNING in production to skip per-request logs)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
 logger = logging.getLogger(__name__)
 
 
@@ -16,6 +19,8 @@ class Config:
 
     # API Configuration
     ANIMALS_API_BASE_URL = os.getenv("ANIMALS_API_BASE_URL", "http://localhost:3123")
+    # Reach a co-located upstream over a Unix socket instead of TCP when set
+    ANIMALS_API_UNIX_SOCKET = os.getenv("ANIMALS_API_UNIX_SOCKET")
 
     # Application metadata
     APP_TITLE = "Animal API"
@@ -26,6 +31,18 @@ class Config:
     MAX_CONCURRENT_REQUESTS = 100
     BATCH_SIZE = 100
     MAX_ANIMALS_PER_BATCH = 100
+    TRANSFORM_BATCH_SIZE = 64
+
+    # ETL pipeline settings (queue sizes bound the records held in memory)
+    PAGE_PREFETCH_WINDOW = 8
+    ETL_ID_QUEUE_SIZE = 2 * MAX_CONCURRENT_REQUESTS
+    # At least one loader, or nothing drains the batch queue
+    ETL_LOADER_CONCURRENCY = max(1, int(os.getenv("ETL_LOADER_CONCURRENCY", "4")))
+    ETL_BATCH_QUEUE_SIZE = ETL_LOADER_CONCURRENCY
+
+    # Adaptive concurrency settings
+    ADMISSION_OVERLOAD_THRESHOLD = 3
+    ADMISSION_RECOVERY_THRESHOLD = 50
 
     # Retry settings
     MAX_RETRIES = 5
@@ -36,6 +53,24 @@ class Config:
     REQUEST_TIMEOUT = 20
     CONNECT_TIMEOUT = 5
     BATCH_POST_TIMEOUT = 60
+    # Proxied animal details are cached in-process; a TTL of 0 disables it
+    ANIMAL_DETAIL_CACHE_TTL = float(os.getenv("ANIMAL_DETAIL_CACHE_TTL", "300"))
+    ANIMAL_DETAIL_CACHE_SIZE = 4096
+    # gzip POST bodies; falls back to plain JSON on a 400/415/422 answer
+    POST_GZIP = os.getenv("POST_GZIP", "false").lower() in ("1", "true", "yes")
+    POST_GZIP_LEVEL = 1
+
+    # Connection pool settings (shared session)
+    HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "200"))
+    # Enough connections for every ETL stage so none waits on the pool
+    HTTP_POOL_LIMIT_PER_HOST = int(
+        os.getenv(
+            "HTTP_POOL_LIMIT_PER_HOST",
+            MAX_CONCURRENT_REQUESTS + PAGE_PREFETCH_WINDOW + ETL_LOADER_CONCURRENCY,
+        )
+    )
+    HTTP_KEEPALIVE_TIMEOUT = int(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "75"))
+    DNS_CACHE_TTL = 300
 
 
 config = Config()
@@ -0,0 +1,96 @@
+"""
+Admission control for outbound requests with a runtime-adjustable limit.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from ..core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class Admission:
+    """Counter-based concurrency limit that can be resized while in use.
+
+    Unlike ``asyncio.Semaphore``, the limit may be lowered or raised safely
+    at any time; waiters simply re-check the counter against the new limit.
+    Consecutive overload signals halve the limit and a streak of successes
+    restores it step by step.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        overload_threshold: Optional[int] = None,
+        recovery_threshold: Optional[int] = None,
+    ):
+        if overload_threshold is None:
+            overload_threshold = config.ADMISSION_OVERLOAD_THRESHOLD
+        if recovery_threshold is None:
+            recovery_threshold = config.ADMISSION_RECOVERY_THRESHOLD
+
+        self._max_limit = max(1, limit)
+        self._limit = self._max_limit
+        self._active = 0
+        self._condition = asyncio.Condition()
+        self._overload_threshold = overload_threshold
+        self._recovery_threshold = recovery_threshold
+        self._overloads = 0
+        self._successes = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Number of requests currently in flight."""
+        return self._active
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free under the current limit and take it."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        """Give a slot back and wake one waiter."""
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify(1)
+
+    async def set_limit(self, new_limit: int) -> None:
+        """Resize the limit; in-flight requests above it finish normally."""
+        async with self._condition:
+            self._limit = max(1, min(new_limit, self._max_limit))
+            self._condition.notify_all()
+
+    async def record_overload(self) -> None:
+        """Register an overload response and halve the limit on a streak."""
+        self._successes = 0
+        self._overloads += 1
+        if self._overloads >= self._overload_threshold:
+            self._overloads = 0
+            await self.set_limit(self._limit // 2)
+            logger.warning("Server overloaded, concurrency limit now %d", self._limit)
+
+    async def record_success(self) -> None:
+        """Register a successful response and grow the limit on a streak."""
+        self._overloads = 0
+        if self._limit >= self._max_limit:
+            return
+        self._successes += 1
+        if self._successes >= self._recovery_threshold:
+            self._successes = 0
+            await self.set_limit(self._limit * 2)
+            logger.info("Server recovered, concurrency limit now %d", self._limit)
+
+    async def __aenter__(self) -> "Admission":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
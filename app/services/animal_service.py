@@ -4,40 +4,154 @@ Animal service containing business logic for animal operations.
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 import aiohttp
 
 from ..core.config import config
-from .data_transformer import chunk_list, transform_animal
+from .admission import Admission
+from .data_transformer import transform_animals_batch
 from .http_client import fetch_with_retry, post_batch_with_retry
 
 logger = logging.getLogger(__name__)
 
 
-async def get_all_animal_ids(base_url: str) -> List[int]:
-    """Fetch all animal IDs from paginated API."""
-    animal_ids = []
-    page = 1
+def _last_page(data: Dict[str, Any]) -> Optional[int]:
+    """Return the last page number advertised by a full listing page, if any."""
+    total_pages = data.get("total_pages")
+    if isinstance(total_pages, int):
+        return total_pages
+    total = data.get("total")
+    if isinstance(total, int):
+        return -(-total // len(data["items"]))
+    return None
+
+
+async def stream_pages(
+    session: aiohttp.ClientSession, base_url: str, window: Optional[int] = None
+) -> AsyncGenerator[Tuple[int, Dict[str, Any]], None]:
+    """Yield (page, data) for each non-empty animals page, in order.
 
-    async with aiohttp.ClientSession() as session:
-        while True:
-            url = f"{base_url}/animals/v1/animals?page={page}"
-            logger.info(f"Fetching animals page {page}")
+    Page 1 is fetched on its own; after that up to ``window`` page requests
+    are kept in flight so listing latency is overlapped. When page 1 reports
+    ``total_pages`` or ``total``, nothing past the last page is requested;
+    otherwise the walk ends at the first empty page and the requests beyond
+    it are cancelled.
+    """
+    if window is None:
+        window = config.PAGE_PREFETCH_WINDOW
+
+    def fetch_page(page: int) -> "asyncio.Task[Optional[Dict]]":
+        url = f"{base_url}/animals/v1/animals?page={page}"
+        return asyncio.ensure_future(fetch_with_retry(session, url))
+
+    pending: Deque[Tuple[int, "asyncio.Task[Optional[Dict]]"]] = deque(
+        [(1, fetch_page(1))]
+    )
+    next_page = 2
+    last_page: Optional[int] = None
 
-            data = await fetch_with_retry(session, url)
+    try:
+        while pending:
+            page, task = pending.popleft()
+            data = await task
             if not data or "items" not in data or not data["items"]:
-                break
+                logger.info("No more animals found on page %d.", page)
+                return
+
+            if page == 1:
+                last_page = _last_page(data)
+            # Top the window back up before handing the page to the caller
+            while len(pending) < window and (
+                last_page is None or next_page <= last_page
+            ):
+                pending.append((next_page, fetch_page(next_page)))
+                next_page += 1
+
+            yield page, data
+            if last_page is not None and page >= last_page:
+                return
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
+async def get_all_animal_ids(
+    session: aiohttp.ClientSession, base_url: str
+) -> List[int]:
+    """Fetch all animal IDs from paginated API."""
+    animal_ids = []
 
-            page_ids = [animal["id"] for animal in data["items"]]
-            animal_ids.extend(page_ids)
-            logger.info(f"Found {len(page_ids)} animals on page {page}")
-            page += 1
+    async for page, data in stream_pages(session, base_url):
+        page_ids = [animal["id"] for animal in data["items"]]
+        animal_ids.extend(page_ids)
+        logger.info("Found %d animals on page %d", len(page_ids), page)
 
-    logger.info(f"Total animals found: {len(animal_ids)}")
+    logger.info("Total animals found: %d", len(animal_ids))
     return animal_ids
 
 
+async def _fetch_single_animal(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    animal_id: int,
+    admission: Admission,
+) -> Optional[Dict[str, Any]]:
+    """Fetch a single raw animal, returning None if it is unavailable."""
+    url = f"{base_url}/animals/v1/animals/{animal_id}"
+    try:
+        async with admission:
+            animal_data = await fetch_with_retry(session, url, admission=admission)
+        if animal_data:
+            return animal_data
+    except Exception as e:
+        logger.error("Exception fetching animal %s: %s", animal_id, e)
+        return None
+
+    logger.warning("Failed to fetch animal %s after all retries", animal_id)
+    return None
+
+
+async def _fetch_worker(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    id_queue: "asyncio.Queue[int]",
+    admission: Admission,
+    raw_animals: List[Dict[str, Any]],
+    transformed_animals: List[Dict[str, Any]],
+    failed_animals: List[int],
+) -> None:
+    """Drain the ID queue, transforming fetched animals in batches."""
+    while True:
+        try:
+            animal_id = id_queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+        result = await _fetch_single_animal(session, base_url, animal_id, admission)
+        if result is None:
+            failed_animals.append(animal_id)
+            continue
+
+        # Transform in batches rather than one animal at a time
+        raw_animals.append(result)
+        if len(raw_animals) >= config.TRANSFORM_BATCH_SIZE:
+            batch = raw_animals[:]
+            raw_animals.clear()
+            transformed_animals.extend(transform_animals_batch(batch))
+
+
 async def fetch_and_transform_animals_with_session(
     session: aiohttp.ClientSession,
     base_url: str,
@@ -48,65 +162,64 @@ async def fetch_and_transform_animals_with_session(
     if max_concurrent is None:
         max_concurrent = config.MAX_CONCURRENT_REQUESTS
 
-    semaphore = asyncio.Semaphore(max_concurrent)
-    transformed_animals = []
-    failed_animals = []
-
-    async def fetch_single_animal(animal_id: int) -> Optional[Dict[str, Any]]:
-        async with semaphore:  # Limit concurrent requests
-            url = f"{base_url}/animals/v1/animals/{animal_id}"
-            animal_data = await fetch_with_retry(session, url)
-
-            if animal_data:
-                return transform_animal(animal_data)
-            logger.warning(f"Failed to fetch animal {animal_id} after all retries")
-            return None
-
-    # Create tasks for all animals in this batch
-    tasks = [fetch_single_animal(animal_id) for animal_id in animal_ids]
-
-    # Wait for all tasks to complete
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Process results
-    for animal_id, result in zip(animal_ids, results):
-        if isinstance(result, Exception):
-            logger.error(f"Exception fetching animal {animal_id}: {result}")
-            failed_animals.append(animal_id)
-        elif result is not None and isinstance(result, dict):
-            transformed_animals.append(result)
-        else:
-            failed_animals.append(animal_id)
+    id_queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for animal_id in animal_ids:
+        id_queue.put_nowait(animal_id)
+    raw_animals: List[Dict[str, Any]] = []
+    transformed_animals: List[Dict[str, Any]] = []
+    failed_animals: List[int] = []
+    admission = Admission(max_concurrent)
+
+    # A fixed pool of workers bounds concurrency without one task per animal
+    worker_count = min(max_concurrent, len(animal_ids))
+    await asyncio.gather(
+        *(
+            _fetch_worker(
+                session,
+                base_url,
+                id_queue,
+                admission,
+                raw_animals,
+                transformed_animals,
+                failed_animals,
+            )
+            for _ in range(worker_count)
+        )
+    )
+    if raw_animals:
+        transformed_animals.extend(transform_animals_batch(raw_animals))
 
     success_count = len(transformed_animals)
     failure_count = len(failed_animals)
 
     logger.info(
-        f"Batch processing complete: {success_count} successful, "
-        f"{failure_count} failed"
+        "Batch processing complete: %d successful, %d failed",
+        success_count,
+        failure_count,
     )
 
-    if failed_animals:
+    if failed_animals and logger.isEnabledFor(logging.WARNING):
         logger.warning(
-            f"Failed animal IDs in batch: {failed_animals[:10]}"
-            f"{'...' if len(failed_animals) > 10 else ''}"
+            "Failed animal IDs in batch: %s%s",
+            failed_animals[:10],
+            "..." if len(failed_animals) > 10 else "",
         )
 
     return transformed_animals
 
 
 async def fetch_and_transform_animals(
-    base_url: str, animal_ids: List[int], max_concurrent: Optional[int] = None
+    session: aiohttp.ClientSession,
+    base_url: str,
+    animal_ids: List[int],
+    max_concurrent: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """Fetch and transform animals concurrently
     (legacy function for backward compatibility).
     """
-    async with aiohttp.ClientSession(
-        connector=aiohttp.TCPConnector(limit=50, limit_per_host=20)
-    ) as session:
-        return await fetch_and_transform_animals_with_session(
-            session, base_url, animal_ids, max_concurrent
-        )
+    return await fetch_and_transform_animals_with_session(
+        session, base_url, animal_ids, max_concurrent
+    )
 
 
 async def process_batch_etl(
@@ -117,7 +230,7 @@ async def process_batch_etl(
 ) -> Dict[str, Any]:
     """Process a single batch following ETL principles: Extract -> Transform -> Load."""
     batch_size = len(animal_ids)
-    logger.info(f"Processing ETL batch {batch_number}: {batch_size} animals")
+    logger.info("Processing ETL batch %d: %d animals", batch_number, batch_size)
 
     # TRANSFORM: Fetch and transform this batch of animals in parallel
     transformed_animals = await fetch_and_transform_animals_with_session(
@@ -125,21 +238,23 @@ async def process_batch_etl(
     )
 
     # LOAD: Post the transformed batch
-    if transformed_animals:
+    processed = len(transformed_animals)
+    if processed:
         success = await post_batch_with_retry(session, base_url, transformed_animals)
         if success:
             logger.info(
-                f"Successfully processed ETL batch {batch_number}: "
-                f"{len(transformed_animals)} animals"
+                "Successfully processed ETL batch %d: %d animals",
+                batch_number,
+                processed,
             )
             return {
                 "batch_number": batch_number,
-                "processed": len(transformed_animals),
-                "failed": batch_size - len(transformed_animals),
+                "processed": processed,
+                "failed": batch_size - processed,
                 "success": True,
             }
         else:
-            logger.error(f"Failed to post ETL batch {batch_number}")
+            logger.error("Failed to post ETL batch %d", batch_number)
             return {
                 "batch_number": batch_number,
                 "processed": 0,
@@ -147,7 +262,7 @@ async def process_batch_etl(
                 "success": False,
             }
     else:
-        logger.warning(f"No animals transformed in ETL batch {batch_number}")
+        logger.warning("No animals transformed in ETL batch %d", batch_number)
         return {
             "batch_number": batch_number,
             "processed": 0,
@@ -156,79 +271,196 @@ async def process_batch_etl(
         }
 
 
-async def process_all_animals_batch(base_url: str) -> Dict[str, Any]:
-    """Process all animals following ETL principles:
-    Extract batches - Transform - Load - repeat.
-    Parallelize processing using concurrent tasks.
+async def _run_stages(*stages: Awaitable[None]) -> None:
+    """Run pipeline stages together, cancelling the rest if any one fails.
+
+    A bare gather would leave the surviving stages running (or blocked on a
+    queue nobody drains) after the first error has been raised.
     """
-    logger.info("Starting ETL processing of all animals")
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
 
-    total_animals = 0
-    total_processed = 0
-    total_failed = 0
-    batches_sent = 0
-    batch_number = 1
+async def _page_producer(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    id_queue: "asyncio.Queue[Optional[int]]",
+    worker_count: int,
+    stats: Dict[str, int],
+) -> None:
+    """EXTRACT stage: walk the pages and queue every animal ID."""
+    pages = stream_pages(session, base_url)
+    try:
+        async for page, data in pages:
+            for animal in data["items"]:
+                await id_queue.put(animal["id"])
+            stats["total_animals"] += len(data["items"])
 
-    async with aiohttp.ClientSession() as session:
-        page = 1
+            logger.info(
+                "Extracted %d animal IDs from page %d", len(data["items"]), page
+            )
+    finally:
+        await pages.aclose()  # Cancel prefetched pages if we stopped early
 
-        while True:
-            # EXTRACT: Get next batch of animal IDs (up to MAX_ANIMALS_PER_BATCH)
-            logger.info(f"Extracting animals from page {page}")
+    # Only signal on success; on failure _run_stages cancels the workers
+    for _ in range(worker_count):
+        await id_queue.put(None)
 
-            url = f"{base_url}/animals/v1/animals?page={page}"
-            data = await fetch_with_retry(session, url)
 
-            if not data or "items" not in data or not data["items"]:
-                logger.info(
-                    f"No more animals found on page {page}. ETL processing complete."
-                )
-                break
+async def _transform_worker(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    id_queue: "asyncio.Queue[Optional[int]]",
+    batch_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]",
+    buffer: List[Dict[str, Any]],
+    admission: Admission,
+    stats: Dict[str, int],
+) -> None:
+    """TRANSFORM stage: fetch animal details and transform each full batch."""
+    while True:
+        animal_id = await id_queue.get()
+        if animal_id is None:
+            return
+
+        result = await _fetch_single_animal(session, base_url, animal_id, admission)
+        if result is None:
+            stats["failed"] += 1
+            continue
+        buffer.append(result)
+
+        if len(buffer) >= config.MAX_ANIMALS_PER_BATCH:
+            batch = buffer[:]
+            buffer.clear()
+            await batch_queue.put(transform_animals_batch(batch))
+
+
+async def _transform_stage(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    id_queue: "asyncio.Queue[Optional[int]]",
+    batch_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]",
+    worker_count: int,
+    loader_count: int,
+    stats: Dict[str, int],
+) -> None:
+    """Run the transform worker pool, then flush and signal the loaders."""
+    buffer: List[Dict[str, Any]] = []
+    admission = Admission(worker_count)
+    await _run_stages(
+        *(
+            _transform_worker(
+                session, base_url, id_queue, batch_queue, buffer, admission, stats
+            )
+            for _ in range(worker_count)
+        )
+    )
+    if buffer:
+        await batch_queue.put(transform_animals_batch(buffer))
 
-            page_animal_ids = [animal["id"] for animal in data["items"]]
-            total_animals += len(page_animal_ids)
+    # Only signal on success; on failure _run_stages cancels the loaders
+    for _ in range(loader_count):
+        await batch_queue.put(None)
 
-            logger.info(f"Extracted {len(page_animal_ids)} animal IDs from page {page}")
 
-            # Process page data in ETL batches of MAX_ANIMALS_PER_BATCH
-            batches = chunk_list(page_animal_ids, config.MAX_ANIMALS_PER_BATCH)
+async def _batch_loader(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    batch_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]",
+    stats: Dict[str, int],
+) -> None:
+    """LOAD stage: post each completed batch."""
+    while True:
+        batch = await batch_queue.get()
+        if batch is None:
+            return
+
+        stats["total_batches"] += 1
+        batch_number = stats["total_batches"]
+        batch_size = len(batch)
+        try:
+            success = await post_batch_with_retry(session, base_url, batch)
+        except Exception as e:
+            logger.error("Exception posting ETL batch %d: %s", batch_number, e)
+            success = False
+
+        if success:
+            logger.info(
+                "Successfully processed ETL batch %d: %d animals",
+                batch_number,
+                batch_size,
+            )
+            stats["processed"] += batch_size
+            stats["batches_sent"] += 1
+        else:
+            logger.error("Failed to post ETL batch %d", batch_number)
+            stats["failed"] += batch_size
 
-            # Create concurrent tasks for batch processing
-            tasks = [
-                process_batch_etl(base_url, batch_ids, batch_number + i, session)
-                for i, batch_ids in enumerate(batches)
-            ]
 
-            # Execute all batch processing tasks concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+async def process_all_animals_batch(
+    session: aiohttp.ClientSession, base_url: str
+) -> Dict[str, Any]:
+    """Process all animals as a pipelined ETL:
+    Extract pages -> Transform animals -> Load batches.
 
-            # Process results
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.error(f"Exception in batch processing: {result}")
-                    total_failed += (
-                        config.MAX_ANIMALS_PER_BATCH
-                    )  # Assume full batch failed
-                elif isinstance(result, dict):
-                    total_processed += result["processed"]
-                    total_failed += result["failed"]
+    The three stages run concurrently and hand work to each other through
+    bounded queues, so page listing, detail fetches and batch posts overlap
+    instead of waiting on one another page by page.
+    """
+    logger.info("Starting ETL processing of all animals")
 
-                    if result["success"]:
-                        batches_sent += 1
+    worker_count = config.MAX_CONCURRENT_REQUESTS
+    # No loaders would hang the pipeline, and a maxsize of 0 means unbounded
+    loader_count = max(1, config.ETL_LOADER_CONCURRENCY)
+    id_queue: "asyncio.Queue[Optional[int]]" = asyncio.Queue(
+        maxsize=max(1, config.ETL_ID_QUEUE_SIZE)
+    )
+    batch_queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = asyncio.Queue(
+        maxsize=max(1, config.ETL_BATCH_QUEUE_SIZE)
+    )
+    stats = {
+        "total_animals": 0,
+        "processed": 0,
+        "failed": 0,
+        "batches_sent": 0,
+        "total_batches": 0,
+    }
 
-            batch_number += len(batches)
-            page += 1
+    await _run_stages(
+        _page_producer(session, base_url, id_queue, worker_count, stats),
+        _transform_stage(
+            session,
+            base_url,
+            id_queue,
+            batch_queue,
+            worker_count,
+            loader_count,
+            stats,
+        ),
+        *(
+            _batch_loader(session, base_url, batch_queue, stats)
+            for _ in range(loader_count)
+        ),
+    )
 
     logger.info(
-        f"ETL processing complete: {total_processed} processed, "
-        f"{total_failed} failed, {batches_sent} batches sent successfully"
+        "ETL processing complete: %d processed, %d failed, "
+        "%d batches sent successfully",
+        stats["processed"],
+        stats["failed"],
+        stats["batches_sent"],
     )
 
     return {
         "message": "ETL processing complete",
-        "total_animals": total_animals,
-        "processed_animals": total_processed,
-        "failed_animals": total_failed,
-        "batches_sent": batches_sent,
-        "total_batches": batch_number - 1,
+        "total_animals": stats["total_animals"],
+        "processed_animals": stats["processed"],
+        "failed_animals": stats["failed"],
+        "batches_sent": stats["batches_sent"],
+        "total_batches": stats["total_batches"],
     }
@@ -3,81 +3,200 @@ Data transformation service for animal data.
 """
 
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+_ISO_FAST = datetime.fromisoformat
+_FRIENDS_SPLIT = re.compile(r"\s*,\s*")
+# Zero-padded non-ISO layouts the upstream sends: yyyy/MM/dd and MM-dd-yyyy
+_SLASHED_DATETIME = re.compile(
+    r"(\d{4})/(\d{2})/(\d{2}) (\d{2}):(\d{2}):(\d{2})", re.ASCII
+)
+_US_DASHED_DATETIME = re.compile(
+    r"(\d{2})-(\d{2})-(\d{4}) (\d{2}):(\d{2}):(\d{2})", re.ASCII
+)
+# Every layout the upstream has been seen to send, in the order they are tried
+_STRPTIME_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m-%d-%Y %H:%M:%S",  # MM-dd-yyyy format
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S%z",
+)
+
+
+@lru_cache(maxsize=4096)
+def _split_friends(friends: str) -> Tuple[str, ...]:
+    """Split a comma-separated friends string; tuples keep cached results safe."""
+    stripped = friends.strip()
+    return tuple(filter(None, _FRIENDS_SPLIT.split(stripped))) if stripped else ()
+
 
 def _transform_friends(friends: Any) -> List[str]:
     """Transform friends field to a list of strings."""
     if not friends:
         return []
 
-    if isinstance(friends, str):
-        return [friend.strip() for friend in friends.split(",") if friend.strip()]
-    elif isinstance(friends, list):
-        return [str(friend).strip() for friend in friends if str(friend).strip()]
+    friends_type = type(friends)
+    if friends_type is str:
+        return list(_split_friends(friends))
+    elif friends_type is list:
+        return [name for friend in friends if (name := str(friend).strip())]
     return []
 
 
-def _parse_datetime_string(born_at: str) -> Optional[str]:
-    """Parse datetime string using common formats."""
-    formats = [
-        "%Y-%m-%d",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y/%m/%d %H:%M:%S",
-        "%m-%d-%Y %H:%M:%S",  # MM-dd-yyyy format
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%SZ",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%dT%H:%M:%S+00:00",
-    ]
-
-    for fmt in formats:
+def _parse_fixed_layout(born_at: str) -> Optional[datetime]:
+    """Build a datetime from a zero-padded non-ISO layout without strptime."""
+    match = _SLASHED_DATETIME.fullmatch(born_at)
+    if match is not None:
+        year, month, day, hour, minute, second = map(int, match.groups())
+    else:
+        match = _US_DASHED_DATETIME.fullmatch(born_at)
+        if match is None:
+            return None
+        month, day, year, hour, minute, second = map(int, match.groups())
+    return datetime(year, month, day, hour, minute, second)
+
+
+def _strptime_format(born_at: str) -> str:
+    """Pick the strptime layout most likely to match a non-ISO string."""
+    if born_at[4:5] == "/":
+        return "%Y/%m/%d %H:%M:%S"
+    if born_at[2:3] == "-":
+        return "%m-%d-%Y %H:%M:%S"  # MM-dd-yyyy format
+    return "%Y-%m-%dT%H:%M:%S%z"
+
+
+def _parse_with_strptime(born_at: str) -> Optional[datetime]:
+    """Parse with the layout picked by shape, then every other known layout.
+
+    The shape check assumes zero-padded fields; unpadded values such as
+    ``1-5-2020 3:4:5`` or ``2020-1-5`` are caught by the full scan.
+    """
+    likely = _strptime_format(born_at)
+    try:
+        return datetime.strptime(born_at, likely)
+    except ValueError:
+        pass
+    for fmt in _STRPTIME_FORMATS:
+        if fmt == likely:
+            continue
         try:
-            dt = datetime.strptime(born_at, fmt)
-            # Convert to UTC and return with +00:00 timezone
-            return dt.isoformat().replace("+00:00", "") + "+00:00"
+            return datetime.strptime(born_at, fmt)
         except ValueError:
             continue
-
-    logger.warning(f"Could not parse born_at: {born_at}")
     return None
 
 
-def _transform_born_at(born_at: Any) -> Optional[str]:
-    """Transform born_at field to ISO format."""
-    if born_at is None:
-        return None
-
+@lru_cache(maxsize=8192)
+def _parse_datetime_string(born_at: str) -> Optional[str]:
+    """Parse datetime string, trying the C-level ISO parser before strptime."""
     try:
-        if isinstance(born_at, (int, float)):
-            dt = datetime.utcfromtimestamp(born_at / 1000.0)
-            return dt.isoformat() + "+00:00"
-        elif isinstance(born_at, str):
-            parsed = _parse_datetime_string(born_at)
-            return parsed if parsed is not None else born_at
-    except Exception as e:
-        logger.warning(f"Error transforming born_at: {e}")
+        dt = _ISO_FAST(born_at.rstrip("Z"))
+    except ValueError:
+        try:
+            parsed = _parse_fixed_layout(born_at) or _parse_with_strptime(born_at)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            logger.warning("Could not parse born_at: %s", born_at)
+            return None
+        dt = parsed
+
+    # Convert to UTC and return with +00:00 timezone
+    if dt.tzinfo is not None:
+        try:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        except OverflowError:
+            logger.warning("born_at out of range in UTC: %s", born_at)
+            return None
+    return dt.isoformat() + "+00:00"
+
+
+def _format_epoch_ms(born_at: float) -> str:
+    """Format epoch milliseconds as ISO-8601 UTC.
+
+    Whole milliseconds, the common case, skip building a datetime; floats
+    keep datetime's own microsecond rounding.
+    """
+    if not isinstance(born_at, int):
+        dt = datetime.fromtimestamp(born_at / 1000.0, timezone.utc)
+        return dt.replace(tzinfo=None).isoformat() + "+00:00"
+
+    seconds, millis = divmod(born_at, 1000)
+    micros = millis * 1000
+    fields = time.gmtime(seconds)[:6]
+    if not 1 <= fields[0] <= 9999:
+        # Match datetime, which cannot represent these years either
+        raise ValueError("year %d is out of range" % fields[0])
+    iso = "%04d-%02d-%02dT%02d:%02d:%02d" % fields
+    if micros:
+        iso += ".%06d" % micros
+    return iso + "+00:00"
+
 
+def _transform_born_at(born_at: Any) -> Optional[str]:
+    """Transform born_at field to ISO format, leaving unparseable values as-is."""
+    born_at_type = type(born_at)
+    if born_at_type is str:
+        parsed = _parse_datetime_string(born_at)
+        return parsed if parsed is not None else born_at
+    if born_at_type is int or born_at_type is float:
+        try:
+            return _format_epoch_ms(born_at)
+        except (OverflowError, OSError, ValueError) as e:
+            # Out-of-range or non-finite timestamps
+            logger.warning("Error transforming born_at: %s", e)
     return born_at
 
 
+def transform_animal_inplace(animal: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the friends and born_at fields of ``animal`` in place.
+
+    Only pass dicts nobody else holds a reference to (e.g. decoded response
+    bodies); use ``transform_animal`` to leave the input untouched.
+    """
+    animal["friends"] = _transform_friends(animal.get("friends"))
+    born_at = animal.get("born_at")
+    if born_at is not None:
+        animal["born_at"] = _transform_born_at(born_at)
+    return animal
+
+
 def transform_animal(animal: Dict[str, Any]) -> Dict[str, Any]:
     """Transform animal data with normalized friends and born_at fields."""
-    transformed = animal.copy()
+    return transform_animal_inplace(animal.copy())
+
+
+def transform_animals_batch(animals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Transform a batch of freshly fetched animals in place and return it."""
+    transform = transform_animal_inplace
+    for animal in animals:
+        transform(animal)
+    return animals
 
-    # Transform friends field
-    transformed["friends"] = _transform_friends(transformed.get("friends"))
 
-    # Transform born_at field
-    if "born_at" in transformed:
-        transformed["born_at"] = _transform_born_at(transformed["born_at"])
+def chunk_iter(iterable: Iterable, chunk_size: int) -> Iterator[List]:
+    """Lazily yield chunks of specified size, holding one chunk at a time."""
+    if isinstance(iterable, list):
+        # Slicing a list is cheaper than pulling items through islice
+        for start in range(0, len(iterable), chunk_size):
+            yield iterable[start : start + chunk_size]
+        return
 
-    return transformed
+    it = iter(iterable)
+    while chunk := list(islice(it, chunk_size)):
+        yield chunk
 
 
 def chunk_list(lst: List, chunk_size: int) -> List[List]:
     """Split a list into chunks of specified size."""
-    return [lst[i : i + chunk_size] for i in range(0, len(lst), chunk_size)]
+    return list(chunk_iter(lst, chunk_size))
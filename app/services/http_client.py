@@ -3,48 +3,123 @@ HTTP client service with retry logic and error handling.
 """
 
 import asyncio
+import gzip
 import logging
+import random
 from typing import Dict, List, Optional, Tuple
 
 import aiohttp
+import orjson
 
 from ..core.config import config
+from .admission import Admission
 
 logger = logging.getLogger(__name__)
 
+_FETCH_TIMEOUT = aiohttp.ClientTimeout(
+    total=config.REQUEST_TIMEOUT, connect=config.CONNECT_TIMEOUT
+)
+_POST_TIMEOUT = aiohttp.ClientTimeout(total=config.BATCH_POST_TIMEOUT)
+
+# Statuses meaning the server could not read a gzip body. Servers without gzip
+# support (including mock_api_server.py) try to parse it as JSON and answer
+# 400/422 rather than 415.
+_GZIP_REJECTED_STATUSES = (400, 415, 422)
+
+# Futures for GET requests currently in flight, keyed by URL
+_INFLIGHT: Dict[str, "asyncio.Future[Optional[Dict]]"] = {}
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create a pooled session meant to be shared for the application lifetime.
+
+    With ANIMALS_API_UNIX_SOCKET set, every request goes over that socket and
+    the base URL only supplies the Host header and path.
+    """
+    connector: aiohttp.BaseConnector
+    if config.ANIMALS_API_UNIX_SOCKET:
+        connector = aiohttp.UnixConnector(
+            path=config.ANIMALS_API_UNIX_SOCKET,
+            limit=config.HTTP_POOL_LIMIT,
+            limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+        )
+    else:
+        connector = aiohttp.TCPConnector(
+            limit=config.HTTP_POOL_LIMIT,
+            limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=config.DNS_CACHE_TTL,
+        )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Return the wait before the next retry.
+
+    A numeric ``Retry-After`` from the server wins (capped at MAX_RETRY_DELAY);
+    otherwise use full jitter over the capped exponential backoff so clients
+    that failed together do not all retry at the same moment.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), config.MAX_RETRY_DELAY)
+        except ValueError:
+            pass  # HTTP-date values are not supported; fall back to jitter
+    backoff = min(config.INITIAL_RETRY_DELAY**attempt, config.MAX_RETRY_DELAY)
+    return random.uniform(0, backoff)
+
 
 async def _handle_http_response(
-    response: aiohttp.ClientResponse, url: str, attempt: int, max_retries: int
+    response: aiohttp.ClientResponse,
+    url: str,
+    attempt: int,
+    max_retries: int,
+    admission: Optional[Admission] = None,
 ) -> Tuple[Optional[Dict], bool]:
     """Handle HTTP response and return (result, should_continue)."""
     if response.status == 200:
-        return await response.json(), False
+        if admission is not None:
+            await admission.record_success()
+        return orjson.loads(await response.read()), False
 
     if response.status == 404:
         return None, False
 
     if response.status in [500, 502, 503, 504]:
-        wait_time = min(config.INITIAL_RETRY_DELAY**attempt, config.MAX_RETRY_DELAY)
+        if response.status == 503 and admission is not None:
+            await admission.record_overload()
+        wait_time = _retry_delay(attempt, response.headers.get("Retry-After"))
         logger.warning(
-            f"Server error {response.status} for {url}, "
-            f"attempt {attempt + 1}/{max_retries}, "
-            f"waiting {wait_time}s"
+            "Server error %s for %s, attempt %d/%d, waiting %.2fs",
+            response.status,
+            url,
+            attempt + 1,
+            max_retries,
+            wait_time,
         )
         if attempt < max_retries - 1:
             await asyncio.sleep(wait_time)
         return None, True
 
-    logger.error(f"Unexpected status {response.status} for {url}")
+    logger.error("Unexpected status %s for %s", response.status, url)
     return None, False
 
 
 async def _handle_timeout_error(url: str, attempt: int, max_retries: int) -> bool:
-    """Handle timeout error and return should_continue."""
-    wait_time = min(3 + attempt * 2, 10)
+    """Handle timeout error and return should_continue.
+
+    A timeout usually means the server is pausing, so the wait keeps a floor
+    of half the 3-10s base backoff and jitters above it.
+    """
+    base = min(3 + attempt * 2, 10)
+    wait_time = random.uniform(base / 2, base)
     logger.warning(
-        f"Timeout for {url} (server may be pausing), "
-        f"attempt {attempt + 1}/{max_retries}, "
-        f"waiting {wait_time}s"
+        "Timeout for %s (server may be pausing), attempt %d/%d, waiting %.2fs",
+        url,
+        attempt + 1,
+        max_retries,
+        wait_time,
     )
     if attempt < max_retries - 1:
         await asyncio.sleep(wait_time)
@@ -55,30 +130,81 @@ async def _handle_client_error(
     url: str, error: aiohttp.ClientError, attempt: int, max_retries: int
 ) -> bool:
     """Handle client error and return should_continue."""
+    wait_time = _retry_delay(attempt)
     logger.warning(
-        f"Connection error for {url}: {error}, " f"attempt {attempt + 1}/{max_retries}"
+        "Connection error for %s: %s, attempt %d/%d, waiting %.2fs",
+        url,
+        error,
+        attempt + 1,
+        max_retries,
+        wait_time,
     )
     if attempt < max_retries - 1:
-        await asyncio.sleep(config.INITIAL_RETRY_DELAY**attempt)
+        await asyncio.sleep(wait_time)
     return True
 
 
 async def fetch_with_retry(
-    session: aiohttp.ClientSession, url: str, max_retries: Optional[int] = None
+    session: aiohttp.ClientSession,
+    url: str,
+    max_retries: Optional[int] = None,
+    admission: Optional[Admission] = None,
 ) -> Optional[Dict]:
-    """Fetch URL with retry logic for handling various error conditions."""
-    if max_retries is None:
-        max_retries = config.MAX_RETRIES
+    """Fetch URL with retry logic for handling various error conditions.
 
-    timeout = aiohttp.ClientTimeout(
-        total=config.REQUEST_TIMEOUT, connect=config.CONNECT_TIMEOUT
+    When an ``admission`` controller is given, 503 responses and successes are
+    reported to it so the caller's concurrency limit adapts to server load.
+
+    Concurrent calls for the same URL share a single request; callers that
+    join an in-flight request get a shallow copy of its result, or its
+    exception. If the original request is cancelled, joined callers fetch
+    the URL themselves.
+    """
+    inflight = _INFLIGHT.get(url)
+    if inflight is not None:
+        try:
+            result = await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise  # This caller was cancelled, not the shared request
+            return await fetch_with_retry(session, url, max_retries, admission)
+        return dict(result) if isinstance(result, dict) else result
+
+    future: "asyncio.Future[Optional[Dict]]" = (
+        asyncio.get_running_loop().create_future()
     )
+    _INFLIGHT[url] = future
+    try:
+        result = await _fetch_with_retry(session, url, max_retries, admission)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Retrieved here so an unjoined failure is not logged
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _INFLIGHT[url]
+
+
+async def _fetch_with_retry(
+    session: aiohttp.ClientSession,
+    url: str,
+    max_retries: Optional[int],
+    admission: Optional[Admission],
+) -> Optional[Dict]:
+    """Perform the GET with retries; see fetch_with_retry."""
+    if max_retries is None:
+        max_retries = config.MAX_RETRIES
 
     for attempt in range(max_retries):
         try:
-            async with session.get(url, timeout=timeout) as response:
+            async with session.get(url, timeout=_FETCH_TIMEOUT) as response:
                 result, should_continue = await _handle_http_response(
-                    response, url, attempt, max_retries
+                    response, url, attempt, max_retries, admission
                 )
                 if not should_continue:
                     return result
@@ -93,11 +219,12 @@ async def fetch_with_retry(
             if not should_continue:
                 break
 
-        except Exception as e:
-            logger.error(f"Unexpected error for {url}: {e}")
+        except ValueError as e:
+            # Body is not JSON (orjson.JSONDecodeError); retrying will not help
+            logger.error("Invalid JSON from %s: %s", url, e)
             return None
 
-    logger.error(f"Failed to fetch {url} after {max_retries} attempts")
+    logger.error("Failed to fetch %s after %d attempts", url, max_retries)
     return None
 
 
@@ -109,56 +236,88 @@ async def _handle_post_response(
         return True, False
 
     if response.status in [500, 502, 503, 504]:
+        wait_time = _retry_delay(attempt, response.headers.get("Retry-After"))
         logger.warning(
-            f"Server error {response.status}, " f"attempt {attempt + 1}/{max_retries}"
+            "Server error %s, attempt %d/%d, waiting %.2fs",
+            response.status,
+            attempt + 1,
+            max_retries,
+            wait_time,
         )
         if attempt < max_retries - 1:
-            await asyncio.sleep(config.INITIAL_RETRY_DELAY**attempt)
+            await asyncio.sleep(wait_time)
         return False, True
 
-    logger.error(f"Failed to send batch: {response.status}")
+    logger.error("Failed to send batch: %s", response.status)
     return False, False
 
 
+async def _pause_before_retry(attempt: int, max_retries: int, delay: float) -> None:
+    """Sleep before the next POST attempt unless this was the last one."""
+    if attempt < max_retries - 1:
+        await asyncio.sleep(delay)
+
+
+def _encode_batch(payload: bytes, compress: bool) -> Tuple[bytes, Dict[str, str]]:
+    """Return the request body and headers for a serialized batch."""
+    if compress:
+        body = gzip.compress(payload, compresslevel=config.POST_GZIP_LEVEL)
+        return body, {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    return payload, {"Content-Type": "application/json"}
+
+
 async def post_batch_with_retry(
     session: aiohttp.ClientSession,
     base_url: str,
     animals: List[Dict],
     max_retries: Optional[int] = None,
 ) -> bool:
-    """Post animal batch with retry logic."""
+    """Post animal batch with retry logic.
+
+    With ``POST_GZIP`` enabled the body is gzip-compressed; a 400, 415 or 422
+    response switches to plain JSON for the remaining attempts.
+    """
     if max_retries is None:
         max_retries = config.MAX_RETRIES
 
     url = f"{base_url}/animals/v1/home"
+    payload = orjson.dumps(animals)
+    compress = config.POST_GZIP
+    body, headers = _encode_batch(payload, compress)
 
-    for attempt in range(max_retries):
+    attempt = 0
+    while attempt < max_retries:
         try:
             async with session.post(
-                url,
-                json=animals,
-                timeout=aiohttp.ClientTimeout(total=config.BATCH_POST_TIMEOUT),
-                headers={"Content-Type": "application/json"},
+                url, data=body, timeout=_POST_TIMEOUT, headers=headers
             ) as response:
+                if response.status in _GZIP_REJECTED_STATUSES and compress:
+                    # Resend at once; the rejected encoding is not an attempt
+                    logger.info(
+                        "Server answered %s to a gzip body, sending plain JSON",
+                        response.status,
+                    )
+                    compress = False
+                    body, headers = _encode_batch(payload, compress)
+                    continue
                 success, should_continue = await _handle_post_response(
                     response, attempt, max_retries
                 )
                 if success:
-                    logger.info(f"Successfully sent batch of {len(animals)} animals")
+                    logger.info("Successfully sent batch of %d animals", len(animals))
                     return True
                 if not should_continue:
                     return False
 
         except asyncio.TimeoutError:
             logger.warning(
-                f"Timeout sending batch, attempt {attempt + 1}/{max_retries}"
+                "Timeout sending batch, attempt %d/%d", attempt + 1, max_retries
             )
-            if attempt < max_retries - 1:
-                await asyncio.sleep(5)
+            await _pause_before_retry(attempt, max_retries, 5)
         except Exception as e:
-            logger.error(f"Error sending batch: {e}")
-            if attempt < max_retries - 1:
-                await asyncio.sleep(2)
+            logger.error("Error sending batch: %s", e)
+            await _pause_before_retry(attempt, max_retries, 2)
+        attempt += 1
 
-    logger.error(f"Failed to send batch after {max_retries} attempts")
+    logger.error("Failed to send batch after %d attempts", max_retries)
     return False
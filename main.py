@@ -1,37 +1,64 @@
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import FastAPI
+import aiohttp
+from fastapi import Depends, FastAPI, Response
+from fastapi.responses import ORJSONResponse
 
 from app.api import endpoints
+from app.api.routing import ORJSONRoute
 from app.core.config import config
+from app.services.http_client import create_session
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Hold one pooled HTTP session open for the lifetime of the application."""
+    app.state.session = create_session()
+    try:
+        yield
+    finally:
+        await app.state.session.close()
+
 
 app = FastAPI(
     title=config.APP_TITLE,
     description=config.APP_DESCRIPTION,
     version=config.APP_VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
+app.router.route_class = ORJSONRoute
 
 
 @app.get("/health")
-async def health_check() -> Dict[str, Any]:
+async def health_check() -> Response:
     return await endpoints.health_check()
 
 
 @app.get("/animals")
-async def get_animals(page: Optional[int] = 1) -> Dict[str, Any]:
-    return await endpoints.get_animals(page)
+async def get_animals(
+    page: Optional[int] = 1,
+    session: aiohttp.ClientSession = Depends(endpoints.get_session),
+) -> Dict[str, Any]:
+    return await endpoints.get_animals(session, page)
 
 
 @app.get("/animals/{animal_id}")
-async def get_animal_details(animal_id: int) -> Dict[str, Any]:
-    return await endpoints.get_animal_details(animal_id)
+async def get_animal_details(
+    animal_id: int,
+    session: aiohttp.ClientSession = Depends(endpoints.get_session),
+) -> Dict[str, Any]:
+    return await endpoints.get_animal_details(session, animal_id)
 
 
-@app.post("/animals/v1/home")
+@app.post("/animals/v1/home", dependencies=[Depends(endpoints.limit_batch_size)])
 async def receive_animals(animals: List[Dict[str, Any]]) -> Dict[str, Any]:
     return await endpoints.receive_animals(animals)
 
 
 @app.post("/process-all-animals")
-async def process_all_animals() -> Dict[str, Any]:
-    return await endpoints.process_all_animals()
+async def process_all_animals(
+    session: aiohttp.ClientSession = Depends(endpoints.get_session),
+) -> Dict[str, Any]:
+    return await endpoints.process_all_animals(session)
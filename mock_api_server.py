@@ -5,13 +5,20 @@ Simple mock API server to provide animal data for testing the main API.
 This server runs on port 3123 and provides the endpoints that the main API expects.
 """
 
+import os
+import sys
 from datetime import datetime
 from typing import Any, Dict, List
 
 import uvicorn
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 
-app = FastAPI(title="Mock Animals API", version="1.0.0")
+app = FastAPI(
+    title="Mock Animals API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # Sample animal data (reduced for clearer testing)
 ANIMALS = {
@@ -98,11 +105,12 @@ async def get_animal_details(animal_id: int):
 @app.post("/animals/v1/home")
 async def receive_animals(animals: List[Dict[str, Any]]):
     """Receive processed animal batches"""
-    print(f"Received batch of {len(animals)} animals:")
-    for animal in animals:
-        print(
-            f"  - {animal.get('name', 'Unknown')} (ID: {animal.get('id', 'Unknown')})"
-        )
+    if animals:
+        first_id = animals[0].get("id", "Unknown")
+        last_id = animals[-1].get("id", "Unknown")
+        print(f"Received batch of {len(animals)} animals (IDs {first_id}..{last_id})")
+    else:
+        print("Received empty batch")
 
     received_batches.append(
         {
@@ -134,4 +142,14 @@ if __name__ == "__main__":
     print("  GET  /debug/received-batches")
     print("🚀 Server starting...")
 
-    uvicorn.run(app, host="0.0.0.0", port=3123, log_level="info")
+    # Serve on a Unix socket instead of TCP when the client is configured for one
+    unix_socket = os.getenv("ANIMALS_API_UNIX_SOCKET")
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=3123,
+        uds=unix_socket,
+        log_level="info",
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
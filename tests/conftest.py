@@ -0,0 +1,37 @@
+"""
+Shared pytest fixtures.
+"""
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.http_client import create_session
+from main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a test client whose lifespan runs once for the whole session"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+async def async_client():
+    """Create an async test client that drives the app without a thread bridge.
+
+    The aiohttp session is bound to the test's event loop, so the fixture
+    swaps in its own session and restores the shared one afterwards.
+    """
+    shared_session = getattr(app.state, "session", None)
+    app.state.session = create_session()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            yield client
+    finally:
+        await app.state.session.close()
+        app.state.session = shared_session
@@ -2,18 +2,7 @@
 Unit tests for ETL processing functionality.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
-
-import pytest
-from fastapi.testclient import TestClient
-
-from main import app
-
-
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
+from unittest.mock import patch
 
 
 class TestETLProcessing:
@@ -3,16 +3,25 @@ Integration tests for full ETL workflow.
 """
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from app.core.config import config
 from app.services.animal_service import (
     fetch_and_transform_animals_with_session,
+    get_all_animal_ids,
     process_all_animals_batch,
     process_batch_etl,
 )
 
+# Sessions are only passed through to patched HTTP helpers, never used
+_SENTINEL_SESSION = object()
+
+_FETCH_RESPONSES_20 = tuple(
+    {"id": i, "name": "Test", "type": "cat"} for i in range(1, 21)
+)
+
 
 class TestFullETLWorkflow:
     """Integration tests for the complete ETL workflow"""
@@ -25,7 +34,7 @@ class TestFullETLWorkflow:
         batch_number = 1
 
         # Mock the session and its methods
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
 
         # Mock the fetch_and_transform_animals_with_session
         mock_transformed_animals = [
@@ -67,7 +76,7 @@ class TestFullETLWorkflow:
         animal_ids = [1, 2, 3]
         batch_number = 1
 
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
 
         with patch(
             "app.services.animal_service.fetch_and_transform_animals_with_session"
@@ -91,7 +100,7 @@ class TestFullETLWorkflow:
         animal_ids = [1, 2, 3]
         batch_number = 1
 
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
         mock_transformed_animals = [
             {"id": 1, "name": "Fluffy", "type": "cat"},
         ]
@@ -121,7 +130,7 @@ class TestFullETLWorkflow:
         animal_ids = [1, 2]
 
         # Mock session and responses
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
 
         # Mock animal data responses
         mock_animal_1 = {"id": 1, "name": "Fluffy", "type": "cat", "friends": "Buddy"}
@@ -129,13 +138,13 @@ class TestFullETLWorkflow:
 
         with patch("app.services.animal_service.fetch_with_retry") as mock_fetch:
             with patch(
-                "app.services.animal_service.transform_animal"
+                "app.services.animal_service.transform_animals_batch"
             ) as mock_transform:
                 # Setup fetch responses
                 mock_fetch.side_effect = [mock_animal_1, mock_animal_2]
 
-                # Setup transform responses
-                mock_transform.side_effect = [
+                # Setup transform response for the whole batch
+                mock_transform.return_value = [
                     {"id": 1, "name": "Fluffy", "type": "cat", "friends": ["Buddy"]},
                     {"id": 2, "name": "Buddy", "type": "dog", "friends": []},
                 ]
@@ -152,7 +161,7 @@ class TestFullETLWorkflow:
 
                 # Verify correct number of calls
                 assert mock_fetch.call_count == 2
-                assert mock_transform.call_count == 2
+                mock_transform.assert_called_once_with([mock_animal_1, mock_animal_2])
 
     @pytest.mark.asyncio
     async def test_fetch_and_transform_animals_with_failures(self):
@@ -160,11 +169,11 @@ class TestFullETLWorkflow:
         base_url = "http://localhost:3123"
         animal_ids = [1, 2, 3]
 
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
 
         with patch("app.services.animal_service.fetch_with_retry") as mock_fetch:
             with patch(
-                "app.services.animal_service.transform_animal"
+                "app.services.animal_service.transform_animals_batch"
             ) as mock_transform:
                 # Setup fetch responses - one success, one failure, one success
                 mock_animal_1 = {"id": 1, "name": "Fluffy", "type": "cat"}
@@ -172,8 +181,8 @@ class TestFullETLWorkflow:
 
                 mock_fetch.side_effect = [mock_animal_1, None, mock_animal_3]
 
-                # Setup transform responses for successful fetches
-                mock_transform.side_effect = [
+                # Setup transform response for the successful fetches
+                mock_transform.return_value = [
                     {"id": 1, "name": "Fluffy", "type": "cat"},
                     {"id": 3, "name": "Whiskers", "type": "cat"},
                 ]
@@ -189,7 +198,185 @@ class TestFullETLWorkflow:
 
                 # Verify calls
                 assert mock_fetch.call_count == 3
-                assert mock_transform.call_count == 2
+                mock_transform.assert_called_once_with([mock_animal_1, mock_animal_3])
+
+    @pytest.mark.asyncio
+    async def test_process_all_animals_batch_pipeline(self):
+        """Test the pipelined ETL extracts, transforms and loads every animal"""
+        base_url = "http://localhost:3123"
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+
+        async def mock_fetch(session, url, **kwargs):
+            if "?page=" in url:
+                page = int(url.split("=")[-1])
+                return {"items": [{"id": i} for i in pages.get(page, [])]}
+            animal_id = int(url.split("/")[-1])
+            if animal_id == 4:
+                return None  # Simulate a fetch failure
+            return {"id": animal_id, "friends": "Buddy, Max"}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            with patch(
+                "app.services.animal_service.post_batch_with_retry"
+            ) as mock_post:
+                mock_post.return_value = True
+                with patch.object(config, "MAX_ANIMALS_PER_BATCH", 2):
+                    result = await process_all_animals_batch(
+                        _SENTINEL_SESSION, base_url
+                    )
+
+        assert result["total_animals"] == 5
+        assert result["processed_animals"] == 4
+        assert result["failed_animals"] == 1
+        assert result["batches_sent"] == 2
+        assert result["total_batches"] == 2
+
+        posted = [animal for call in mock_post.call_args_list for animal in call[0][2]]
+        assert sorted(animal["id"] for animal in posted) == [1, 2, 3, 5]
+        assert all(animal["friends"] == ["Buddy", "Max"] for animal in posted)
+
+    @pytest.mark.asyncio
+    async def test_process_all_animals_batch_clamps_non_positive_settings(self):
+        """Test zero loaders and zero-sized queues still drain the pipeline"""
+
+        async def mock_fetch(session, url, **kwargs):
+            if "?page=" in url:
+                page = int(url.split("=")[-1])
+                return {"items": [{"id": 1}, {"id": 2}] if page == 1 else []}
+            return {"id": int(url.split("/")[-1]), "friends": ""}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            with patch(
+                "app.services.animal_service.post_batch_with_retry", return_value=True
+            ):
+                with patch.multiple(
+                    config,
+                    ETL_LOADER_CONCURRENCY=0,
+                    ETL_ID_QUEUE_SIZE=0,
+                    ETL_BATCH_QUEUE_SIZE=0,
+                ):
+                    result = await asyncio.wait_for(
+                        process_all_animals_batch(
+                            _SENTINEL_SESSION, "http://localhost:3123"
+                        ),
+                        timeout=5,
+                    )
+
+        assert result["processed_animals"] == 2
+        assert result["batches_sent"] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_all_animal_ids_prefetches_pages_in_order(self):
+        """Test page prefetching keeps page order and stops at the first empty page"""
+        base_url = "http://localhost:3123"
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        requested_pages = []
+
+        async def mock_fetch(session, url, **kwargs):
+            page = int(url.split("=")[-1])
+            requested_pages.append(page)
+            # Later pages answer first to prove results are reordered
+            await asyncio.sleep(0.01 * (4 - min(page, 4)))
+            return {"items": [{"id": i} for i in pages.get(page, [])]}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            result = await get_all_animal_ids(_SENTINEL_SESSION, base_url)
+
+        assert result == [1, 2, 3, 4, 5]
+        assert sorted(requested_pages)[:4] == [1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_get_all_animal_ids_stops_at_advertised_total(self):
+        """Test pages past the total reported on page 1 are never walked"""
+        base_url = "http://localhost:3123"
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        requested_pages = []
+
+        async def mock_fetch(session, url, **kwargs):
+            page = int(url.split("=")[-1])
+            requested_pages.append(page)
+            items = [{"id": i} for i in pages.get(page, [])]
+            return {"items": items, "page": page, "total": 5}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            with patch.object(config, "PAGE_PREFETCH_WINDOW", 2):
+                result = await get_all_animal_ids(_SENTINEL_SESSION, base_url)
+
+        assert result == [1, 2, 3, 4, 5]
+        assert sorted(requested_pages) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_get_all_animal_ids_small_listing_requests_only_its_pages(self):
+        """Test a listing shorter than the prefetch window is not over-fetched"""
+        base_url = "http://localhost:3123"
+        pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+        requested_pages = []
+
+        async def mock_fetch(session, url, **kwargs):
+            page = int(url.split("=")[-1])
+            requested_pages.append(page)
+            items = [{"id": i} for i in pages.get(page, [])]
+            return {"items": items, "page": page, "total": 5}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            result = await get_all_animal_ids(_SENTINEL_SESSION, base_url)
+
+        assert result == [1, 2, 3, 4, 5]
+        assert sorted(requested_pages) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_process_all_animals_batch_producer_failure_cancels_stages(self):
+        """Test a failing extract stage stops every other stage"""
+        base_url = "http://localhost:3123"
+
+        async def mock_fetch(session, url, **kwargs):
+            if "?page=" in url:
+                return {"items": [{"name": "no id"}]}  # KeyError in the producer
+            return {"id": 1}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            with patch("app.services.animal_service.post_batch_with_retry"):
+                with pytest.raises(KeyError):
+                    await process_all_animals_batch(_SENTINEL_SESSION, base_url)
+
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    @pytest.mark.asyncio
+    async def test_process_all_animals_batch_worker_failure_cancels_stages(self):
+        """Test a failing transform worker stops the producer and loaders"""
+        base_url = "http://localhost:3123"
+
+        async def mock_fetch(session, url, **kwargs):
+            if "?page=" in url:
+                page = int(url.split("=")[-1])
+                return {"items": [{"id": page * 10 + i} for i in range(5)]}
+            return {"id": int(url.split("/")[-1])}
+
+        with patch(
+            "app.services.animal_service.fetch_with_retry", side_effect=mock_fetch
+        ):
+            with patch(
+                "app.services.animal_service.transform_animals_batch",
+                side_effect=RuntimeError("transform failed"),
+            ):
+                with patch("app.services.animal_service.post_batch_with_retry"):
+                    with patch.object(config, "MAX_ANIMALS_PER_BATCH", 2):
+                        with pytest.raises(RuntimeError):
+                            await process_all_animals_batch(_SENTINEL_SESSION, base_url)
+
+        assert asyncio.all_tasks() == {asyncio.current_task()}
 
 
 class TestETLConcurrencyAndParallelism:
@@ -218,21 +405,17 @@ class TestETLConcurrencyAndParallelism:
                 "app.services.animal_service.post_batch_with_retry"
             ) as mock_post:
                 with patch(
-                    "app.services.animal_service.transform_animal"
+                    "app.services.animal_service.transform_animals_batch"
                 ) as mock_transform:
                     # Setup successful responses
                     mock_fetch.return_value = {"id": 1, "name": "Test", "type": "cat"}
-                    mock_transform.return_value = {
-                        "id": 1,
-                        "name": "Test",
-                        "type": "cat",
-                    }
+                    mock_transform.side_effect = lambda animals: animals
                     mock_post.return_value = True
 
                     # Create tasks for concurrent processing (simulated)
                     tasks = []
                     for animal_ids, batch_number in batch_data:
-                        mock_session = MagicMock()
+                        mock_session = _SENTINEL_SESSION
                         task = process_batch_etl(
                             base_url, animal_ids, batch_number, mock_session
                         )
@@ -253,42 +436,34 @@ class TestETLConcurrencyAndParallelism:
         """Test that semaphore properly controls concurrent requests."""
         base_url = "http://localhost:3123"
         animal_ids = list(range(1, 21))  # 20 animals
-        mock_session = MagicMock()
+        mock_session = _SENTINEL_SESSION
 
-        call_times = []
+        in_flight = 0
+        max_in_flight = 0
+        responses = iter(_FETCH_RESPONSES_20)
 
-        async def mock_fetch_with_delay(*args, **kwargs):
-            """Mock fetch that records call times"""
-            import time
-
-            call_times.append(time.time())
-            await asyncio.sleep(0.1)  # Simulate network delay
-            return {"id": args[1].split("/")[-1], "name": "Test", "type": "cat"}
+        async def mock_fetch_counting(*args, **kwargs):
+            """Mock fetch that tracks how many calls overlap"""
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)  # Yield so other workers can start
+            in_flight -= 1
+            return next(responses)
 
         with patch(
             "app.services.animal_service.fetch_with_retry",
-            side_effect=mock_fetch_with_delay,
+            side_effect=mock_fetch_counting,
         ):
             with patch(
-                "app.services.animal_service.transform_animal"
+                "app.services.animal_service.transform_animals_batch"
             ) as mock_transform:
-                mock_transform.return_value = {"id": 1, "name": "Test", "type": "cat"}
-
-                start_time = asyncio.get_event_loop().time()
+                mock_transform.side_effect = lambda animals: animals
 
                 result = await fetch_and_transform_animals_with_session(
                     mock_session, base_url, animal_ids, max_concurrent=5
                 )
 
-                end_time = asyncio.get_event_loop().time()
-
-                # Verify results
-                assert len(result) == 20
-
-                # With max_concurrent=5 and 20 items, we should have ~4 batches
-                # Total time should be roughly 4 * 0.1 = 0.4 seconds (plus overhead)
-                execution_time = end_time - start_time
-                assert (
-                    execution_time < 1.0
-                )  # Should be much faster than sequential (2.0s)
-                assert execution_time > 0.3  # But not instantaneous
+        assert len(result) == 20
+        # Requests overlap, but never more than max_concurrent at once
+        assert max_in_flight == 5
@@ -0,0 +1,26 @@
+"""
+Helpers for faking upstream HTTP calls made through aiohttp.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from aioresponses import aioresponses
+
+from app.core.config import config
+
+ANIMALS_URL = f"{config.ANIMALS_API_BASE_URL}/animals/v1/animals"
+
+
+@contextmanager
+def patched_session(
+    url: str, status: int = 200, payload: Optional[Any] = None
+) -> Iterator[aioresponses]:
+    """Answer one GET of ``url`` with ``status`` and a JSON ``payload``.
+
+    Any aiohttp session used inside the block is intercepted; the
+    aioresponses mock is yielded for call assertions.
+    """
+    with aioresponses() as mocked:
+        mocked.get(url, status=status, payload=payload)
+        yield mocked
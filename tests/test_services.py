@@ -2,13 +2,25 @@
 Tests for service layer utilities.
 """
 
-from unittest.mock import AsyncMock, patch
+import asyncio
+import gzip
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import aiohttp
 import pytest
+from aioresponses import aioresponses
+from yarl import URL
 
+from app.core.config import config
 from app.services.data_transformer import chunk_list, transform_animal
-from app.services.http_client import fetch_with_retry
+from app.services.http_client import (
+    _handle_timeout_error,
+    _retry_delay,
+    create_session,
+    fetch_with_retry,
+    post_batch_with_retry,
+)
+from tests.support.aiohttp_mock import patched_session
 
 
 class TestDataTransformer:
@@ -106,12 +118,7 @@ class TestHTTPClient:
         url = "http://test/api/data"
         mock_data = {"key": "value"}
 
-        with patch("aiohttp.ClientSession.get") as mock_get:
-            mock_response = AsyncMock()
-            mock_response.status = 200
-            mock_response.json.return_value = mock_data
-            mock_get.return_value.__aenter__.return_value = mock_response
-
+        with patched_session(url, payload=mock_data):
             async with aiohttp.ClientSession() as session:
                 result = await fetch_with_retry(session, url)
 
@@ -122,12 +129,218 @@ class TestHTTPClient:
         """Test fetch returns None for 404 error"""
         url = "http://test/api/data"
 
-        with patch("aiohttp.ClientSession.get") as mock_get:
-            mock_response = AsyncMock()
-            mock_response.status = 404
-            mock_get.return_value.__aenter__.return_value = mock_response
-
+        with patched_session(url, status=404):
             async with aiohttp.ClientSession() as session:
                 result = await fetch_with_retry(session, url)
 
             assert result is None
+
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_retries_server_disconnect(self):
+        """Test a dropped keep-alive connection is retried like other errors"""
+        url = "http://test/api/data"
+
+        with aioresponses() as mocked:
+            mocked.get(url, exception=aiohttp.ServerDisconnectedError())
+            mocked.get(url, payload={"key": "value"})
+            with patch("app.services.http_client.asyncio.sleep", new=AsyncMock()):
+                async with aiohttp.ClientSession() as session:
+                    result = await fetch_with_retry(session, url)
+
+        assert result == {"key": "value"}
+
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_invalid_json_is_not_retried(self):
+        """Test a non-JSON body gives up at once instead of retrying"""
+        url = "http://test/api/data"
+
+        with aioresponses() as mocked:
+            mocked.get(url, body="not json", repeat=True)
+            async with aiohttp.ClientSession() as session:
+                result = await fetch_with_retry(session, url)
+
+        assert result is None
+        assert len(mocked.requests[("GET", URL(url))]) == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_coalesces_concurrent_requests(self):
+        """Test concurrent fetches of the same URL share one request"""
+        url = "http://test/api/data"
+        calls = []
+
+        async def mock_fetch(session, url, max_retries, admission):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return {"key": "value"}
+
+        with patch(
+            "app.services.http_client._fetch_with_retry", side_effect=mock_fetch
+        ):
+            first, second = await asyncio.gather(
+                fetch_with_retry(MagicMock(), url),
+                fetch_with_retry(MagicMock(), url),
+            )
+
+        assert calls == [url]
+        assert first == second == {"key": "value"}
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_joined_call_survives_owner_cancellation(self):
+        """Test cancelling the shared request makes joined callers refetch"""
+        url = "http://test/api/data"
+        calls = []
+
+        async def mock_fetch(session, url, max_retries, admission):
+            calls.append(url)
+            if len(calls) == 1:
+                await asyncio.sleep(10)  # The owner is cancelled while waiting
+            return {"key": "value"}
+
+        with patch(
+            "app.services.http_client._fetch_with_retry", side_effect=mock_fetch
+        ):
+            owner = asyncio.ensure_future(fetch_with_retry(MagicMock(), url))
+            await asyncio.sleep(0)
+            joined = asyncio.ensure_future(fetch_with_retry(MagicMock(), url))
+            await asyncio.sleep(0)
+            owner.cancel()
+            result = await joined
+
+        assert owner.cancelled()
+        assert result == {"key": "value"}
+        assert calls == [url, url]
+
+    @pytest.mark.asyncio
+    async def test_fetch_with_retry_joined_call_gets_owner_exception(self):
+        """Test an error in the shared request is raised to joined callers"""
+        url = "http://test/api/data"
+
+        async def mock_fetch(session, url, max_retries, admission):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        with patch(
+            "app.services.http_client._fetch_with_retry", side_effect=mock_fetch
+        ):
+            results = await asyncio.gather(
+                fetch_with_retry(MagicMock(), url),
+                fetch_with_retry(MagicMock(), url),
+                return_exceptions=True,
+            )
+
+        assert [type(result) for result in results] == [RuntimeError] * 2
+
+    @pytest.mark.asyncio
+    async def test_create_session_uses_unix_socket_when_configured(self):
+        """Test the session connects over a Unix socket when one is configured"""
+        with patch.object(config, "ANIMALS_API_UNIX_SOCKET", "/tmp/animals.sock"):
+            session = create_session()
+        try:
+            assert isinstance(session.connector, aiohttp.UnixConnector)
+            assert session.connector.path == "/tmp/animals.sock"
+        finally:
+            await session.close()
+
+    def test_retry_delay_honors_retry_after(self):
+        """Test a numeric Retry-After header overrides the backoff"""
+        assert _retry_delay(0, "3") == 3.0
+        assert _retry_delay(0, "3600") == config.MAX_RETRY_DELAY
+
+    def test_retry_delay_full_jitter(self):
+        """Test the backoff is jittered between zero and the capped exponential"""
+        delays = [_retry_delay(3, None) for _ in range(50)]
+
+        assert all(0 <= delay <= config.INITIAL_RETRY_DELAY**3 for delay in delays)
+        assert len(set(delays)) > 1
+
+    @pytest.mark.asyncio
+    async def test_timeouts_and_connection_errors_use_jittered_backoff(self):
+        """Test transport failures wait a jittered delay, not a fixed one"""
+        url = "http://test/api/data"
+
+        with aioresponses() as mocked:
+            mocked.get(url, timeout=True)
+            mocked.get(url, exception=aiohttp.ClientConnectionError())
+            mocked.get(url, payload={"key": "value"})
+            with patch(
+                "app.services.http_client.random.uniform", return_value=0.25
+            ) as uniform:
+                with patch(
+                    "app.services.http_client.asyncio.sleep", new=AsyncMock()
+                ) as sleep:
+                    async with aiohttp.ClientSession() as session:
+                        result = await fetch_with_retry(session, url)
+
+        assert result == {"key": "value"}
+        assert [call.args for call in uniform.call_args_list] == [
+            (1.5, 3),  # Timeout on the first attempt keeps a floor
+            (0, config.INITIAL_RETRY_DELAY**1),
+        ]
+        assert [call.args for call in sleep.await_args_list] == [(0.25,), (0.25,)]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("attempt,floor,ceiling", [(0, 1.5, 3), (4, 5, 10)])
+    async def test_timeout_backoff_keeps_a_floor(self, attempt, floor, ceiling):
+        """Test a timeout never retries straight into a pausing server"""
+        with patch("app.services.http_client.asyncio.sleep", new=AsyncMock()) as sleep:
+            for _ in range(50):
+                await _handle_timeout_error("http://test", attempt, 10)
+
+        waits = [call.args[0] for call in sleep.await_args_list]
+        assert all(floor <= wait <= ceiling for wait in waits)
+        assert len(set(waits)) > 1
+
+    def test_retry_delay_ignores_http_date(self):
+        """Test an HTTP-date Retry-After falls back to jittered backoff"""
+        delay = _retry_delay(1, "Wed, 21 Oct 2015 07:28:00 GMT")
+        assert 0 <= delay <= config.INITIAL_RETRY_DELAY
+
+    @pytest.mark.asyncio
+    async def test_post_batch_falls_back_to_plain_json_on_415(self):
+        """Test a gzip body rejected with 415 is resent uncompressed"""
+        rejected = AsyncMock(status=415)
+        accepted = AsyncMock(status=200)
+        session = MagicMock()
+        session.post.return_value.__aenter__.side_effect = [rejected, accepted]
+
+        with patch.object(config, "POST_GZIP", True):
+            result = await post_batch_with_retry(session, "http://test", [{"id": 1}])
+
+        assert result is True
+        first, second = session.post.call_args_list
+        assert first.kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert gzip.decompress(first.kwargs["data"]) == b'[{"id":1}]'
+        assert "Content-Encoding" not in second.kwargs["headers"]
+        assert second.kwargs["data"] == b'[{"id":1}]'
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [400, 422])
+    async def test_post_batch_falls_back_when_gzip_body_is_unreadable(self, status):
+        """Test servers that parse the gzip body as JSON also trigger the fallback"""
+        rejected = AsyncMock(status=status)
+        accepted = AsyncMock(status=200)
+        session = MagicMock()
+        session.post.return_value.__aenter__.side_effect = [rejected, accepted]
+
+        with patch.object(config, "POST_GZIP", True):
+            result = await post_batch_with_retry(session, "http://test", [{"id": 1}])
+
+        assert result is True
+        assert "Content-Encoding" not in session.post.call_args.kwargs["headers"]
+
+    @pytest.mark.asyncio
+    async def test_post_batch_415_fallback_does_not_use_an_attempt(self):
+        """Test the plain-JSON resend happens even with a single attempt"""
+        rejected = AsyncMock(status=415)
+        accepted = AsyncMock(status=200)
+        session = MagicMock()
+        session.post.return_value.__aenter__.side_effect = [rejected, accepted]
+
+        with patch.object(config, "POST_GZIP", True):
+            result = await post_batch_with_retry(
+                session, "http://test", [{"id": 1}], max_retries=1
+            )
+
+        assert result is True
+        assert session.post.call_count == 2
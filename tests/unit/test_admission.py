@@ -0,0 +1,72 @@
+"""
+Unit tests for adaptive admission control.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.admission import Admission
+
+
+class TestAdmission:
+    """Tests for the Admission concurrency controller"""
+
+    @pytest.mark.asyncio
+    async def test_admission_limits_concurrency(self):
+        """Test that no more than `limit` holders are admitted at once"""
+        admission = Admission(3)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def task():
+            nonlocal in_flight, max_in_flight
+            async with admission:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0)
+                in_flight -= 1
+
+        await asyncio.gather(*(task() for _ in range(10)))
+
+        assert max_in_flight == 3
+        assert admission.active == 0
+
+    @pytest.mark.asyncio
+    async def test_set_limit_blocks_new_holders(self):
+        """Test that lowering the limit holds back new acquirers"""
+        admission = Admission(2)
+        await admission.acquire()
+        await admission.set_limit(1)
+
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await admission.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert admission.active == 1
+
+    @pytest.mark.asyncio
+    async def test_overloads_halve_and_successes_restore_limit(self):
+        """Test the adaptive limit reacts to overload and recovery streaks"""
+        admission = Admission(8, overload_threshold=2, recovery_threshold=3)
+
+        await admission.record_overload()
+        assert admission.limit == 8
+        await admission.record_overload()
+        assert admission.limit == 4
+
+        for _ in range(3):
+            await admission.record_success()
+        assert admission.limit == 8
+
+    @pytest.mark.asyncio
+    async def test_limit_never_drops_below_one(self):
+        """Test that repeated overloads keep at least one slot available"""
+        admission = Admission(2, overload_threshold=1)
+
+        for _ in range(5):
+            await admission.record_overload()
+
+        assert admission.limit == 1
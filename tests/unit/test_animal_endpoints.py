@@ -2,76 +2,61 @@
 Unit tests for animal endpoints.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 
 import pytest
-from fastapi.testclient import TestClient
 
+from app.api import endpoints
 from main import app
+from tests.support.aiohttp_mock import ANIMALS_URL, patched_session
 
-
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
+# One animal past the batch limit; smaller batches are prefixes of it
+_ANIMALS_101 = tuple({"id": i, "name": f"Animal{i}"} for i in range(101))
 
 
 class TestReceiveAnimalsEndpoint:
     """Tests for receive animals endpoint"""
 
-    def test_receive_animals_success(self, client):
-        """Test successful receipt of animals"""
-        animals_data = [
-            {"id": 1, "name": "Fluffy", "type": "cat"},
-            {"id": 2, "name": "Buddy", "type": "dog"},
-        ]
-
-        response = client.post("/animals/v1/home", json=animals_data)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Successfully received 2 animals"
-        assert data["count"] == 2
-
-    def test_receive_animals_empty_list(self, client):
-        """Test receiving empty animals list"""
-        response = client.post("/animals/v1/home", json=[])
-        assert response.status_code == 200
+    @pytest.mark.parametrize(
+        "count,expected_status",
+        [(0, 200), (1, 200), (2, 200), (100, 200), (101, 400)],
+    )
+    def test_receive_animals_batch_sizes(self, client, count, expected_status):
+        """Test batches up to the limit are accepted and larger ones rejected"""
+        response = client.post("/animals/v1/home", json=list(_ANIMALS_101[:count]))
+        assert response.status_code == expected_status
         data = response.json()
-        assert data["count"] == 0
-
-    def test_receive_animals_too_many(self, client):
-        """Test receiving too many animals (>100)"""
-        animals_data = [{"id": i, "name": f"Animal{i}"} for i in range(101)]
-        response = client.post("/animals/v1/home", json=animals_data)
-        assert response.status_code == 400
-        assert "Maximum 100 animals per batch" in response.json()["detail"]
+        if expected_status == 200:
+            assert data["message"] == f"Successfully received {count} animals"
+            assert data["count"] == count
+        else:
+            assert "Maximum 100 animals per batch" in data["detail"]
 
     def test_receive_animals_invalid_data(self, client):
         """Test receiving invalid animals data"""
         response = client.post("/animals/v1/home", json="invalid")
         assert response.status_code == 422  # FastAPI validation error
 
-    def test_receive_animals_single_animal(self, client):
-        """Test receiving single animal"""
-        animal_data = [{"id": 1, "name": "Rex", "type": "dog"}]
-        response = client.post("/animals/v1/home", json=animal_data)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["count"] == 1
+    def test_receive_animals_too_many_rejected_before_validation(self, client):
+        """Test an oversized batch gets a 400 even if its items are invalid"""
+        response = client.post("/animals/v1/home", json=list(range(101)))
+        assert response.status_code == 400
 
-    def test_receive_animals_maximum_allowed(self, client):
-        """Test receiving exactly 100 animals (boundary test)"""
-        animals_data = [{"id": i, "name": f"Animal{i}"} for i in range(100)]
-        response = client.post("/animals/v1/home", json=animals_data)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["count"] == 100
+    def test_receive_animals_malformed_json(self, client):
+        """Test a body that is not valid JSON is rejected"""
+        response = client.post(
+            "/animals/v1/home",
+            content=b'[{"id": 1,',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 422
 
 
 class TestExternalAPIEndpoints:
     """Tests for endpoints that call external APIs"""
 
-    def test_get_animals_success(self, client):
+    @pytest.mark.asyncio
+    async def test_get_animals_success(self, async_client):
         """Test successful retrieval of animals"""
         mock_data = {
             "items": [
@@ -82,75 +67,29 @@ class TestExternalAPIEndpoints:
             "total": 2,
         }
 
-        with patch("app.api.endpoints.aiohttp.ClientSession") as mock_session:
-            # Create mock response
-            mock_response = MagicMock()
-            mock_response.status = 200
-            mock_response.json = AsyncMock(return_value=mock_data)
-
-            # Create mock context manager for the get request
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value = mock_response
-
-            # Create mock session context manager
-            mock_session_instance = MagicMock()
-            mock_session_instance.get.return_value = mock_context
-
-            mock_session_context = AsyncMock()
-            mock_session_context.__aenter__.return_value = mock_session_instance
-            mock_session.return_value = mock_session_context
-
-            response = client.get("/animals")
+        with patched_session(f"{ANIMALS_URL}?page=1", payload=mock_data):
+            response = await async_client.get("/animals")
             assert response.status_code == 200
             assert response.json() == mock_data
 
-    def test_get_animals_api_error(self, client):
+    @pytest.mark.asyncio
+    async def test_get_animals_api_error(self, async_client):
         """Test animals endpoint when external API returns error"""
-        with patch("app.api.endpoints.aiohttp.ClientSession") as mock_session:
-            # Create mock response with error status
-            mock_response = MagicMock()
-            mock_response.status = 500
-
-            # Create mock context manager for the get request
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value = mock_response
-
-            # Create mock session context manager
-            mock_session_instance = MagicMock()
-            mock_session_instance.get.return_value = mock_context
-
-            mock_session_context = AsyncMock()
-            mock_session_context.__aenter__.return_value = mock_session_instance
-            mock_session.return_value = mock_session_context
-
-            response = client.get("/animals")
+        with patched_session(f"{ANIMALS_URL}?page=1", status=500):
+            response = await async_client.get("/animals")
             assert response.status_code == 500
             assert "Failed to fetch animals" in response.json()["detail"]
 
-    def test_get_animal_details_not_found(self, client):
+    @pytest.mark.asyncio
+    async def test_get_animal_details_not_found(self, async_client):
         """Test animal details endpoint when animal not found"""
-        with patch("app.api.endpoints.aiohttp.ClientSession") as mock_session:
-            # Create mock response with 404 status
-            mock_response = MagicMock()
-            mock_response.status = 404
-
-            # Create mock context manager for the get request
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value = mock_response
-
-            # Create mock session context manager
-            mock_session_instance = MagicMock()
-            mock_session_instance.get.return_value = mock_context
-
-            mock_session_context = AsyncMock()
-            mock_session_context.__aenter__.return_value = mock_session_instance
-            mock_session.return_value = mock_session_context
-
-            response = client.get("/animals/999")
+        with patched_session(f"{ANIMALS_URL}/999", status=404):
+            response = await async_client.get("/animals/999")
             assert response.status_code == 404
             assert "Animal with ID 999 not found" in response.json()["detail"]
 
-    def test_get_animals_with_page_parameter(self, client):
+    @pytest.mark.asyncio
+    async def test_get_animals_with_page_parameter(self, async_client):
         """Test animals endpoint with page parameter"""
         mock_data = {
             "items": [{"id": 3, "name": "Whiskers", "type": "cat"}],
@@ -158,21 +97,20 @@ class TestExternalAPIEndpoints:
             "total": 1,
         }
 
-        with patch("app.api.endpoints.aiohttp.ClientSession") as mock_session:
-            mock_response = MagicMock()
-            mock_response.status = 200
-            mock_response.json = AsyncMock(return_value=mock_data)
-
-            mock_context = AsyncMock()
-            mock_context.__aenter__.return_value = mock_response
+        with patched_session(f"{ANIMALS_URL}?page=2", payload=mock_data):
+            response = await async_client.get("/animals?page=2")
+            assert response.status_code == 200
+            assert response.json() == mock_data
 
-            mock_session_instance = MagicMock()
-            mock_session_instance.get.return_value = mock_context
+    @pytest.mark.asyncio
+    async def test_get_animal_details_served_from_cache(self, async_client):
+        """Test repeated detail lookups hit the upstream API only once"""
+        mock_data = {"id": 7, "name": "Rex", "type": "dog"}
 
-            mock_session_context = AsyncMock()
-            mock_session_context.__aenter__.return_value = mock_session_instance
-            mock_session.return_value = mock_session_context
+        with patch.dict(endpoints._DETAIL_CACHE, clear=True):
+            with patched_session(f"{ANIMALS_URL}/7", payload=mock_data) as mocked:
+                first = await async_client.get("/animals/7")
+                second = await async_client.get("/animals/7")
 
-            response = client.get("/animals?page=2")
-            assert response.status_code == 200
-            assert response.json() == mock_data
+        assert first.json() == second.json() == mock_data
+        mocked.assert_called_once_with(f"{ANIMALS_URL}/7")
@@ -6,13 +6,27 @@ import pytest
 
 from app.services.data_transformer import (
     _parse_datetime_string,
+    _split_friends,
     _transform_born_at,
     _transform_friends,
+    chunk_iter,
     chunk_list,
     transform_animal,
+    transform_animal_inplace,
+    transform_animals_batch,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_parse_caches():
+    """Start every test with empty parse caches so results are not replayed"""
+    _parse_datetime_string.cache_clear()
+    _split_friends.cache_clear()
+    yield
+    _parse_datetime_string.cache_clear()
+    _split_friends.cache_clear()
+
+
 class TestDataTransformer:
     """Tests for data transformation functions"""
 
@@ -51,6 +65,33 @@ class TestDataTransformer:
         assert result["type"] == "dog"
         # Fields not present should remain as is or be handled gracefully
 
+    def test_transform_animal_leaves_input_untouched(self):
+        """Test the copying transform and the in-place one agree"""
+        animal = {"id": 3, "friends": "Buddy, Rex", "born_at": 1640995200000}
+
+        copied = transform_animal(animal)
+        assert copied is not animal
+        assert animal["friends"] == "Buddy, Rex"
+
+        in_place = transform_animal_inplace(animal)
+        assert in_place is animal
+        assert in_place == copied
+
+    def test_transform_animals_batch_in_place(self):
+        """Test batch transformation mutates and returns the given records"""
+        animals = [
+            {"id": 1, "friends": "Buddy, Rex", "born_at": "2020-01-15T10:30:00Z"},
+            {"id": 2, "born_at": None},
+        ]
+
+        result = transform_animals_batch(animals)
+
+        assert result is animals
+        assert animals[0]["friends"] == ["Buddy", "Rex"]
+        assert animals[0]["born_at"] == "2020-01-15T10:30:00+00:00"
+        assert animals[1]["friends"] == []
+        assert animals[1]["born_at"] is None
+
     def test_transform_friends_string_input(self):
         """Test transforming friends from string to list"""
         friends_string = "Buddy,Rex,Whiskers"
@@ -73,23 +114,59 @@ class TestDataTransformer:
         result = _transform_friends(friends_list)
         assert result == ["Buddy", "Rex"]
 
+    def test_transform_friends_list_input_strips_and_drops_blanks(self):
+        """Test list entries are stringified, stripped and blank ones dropped"""
+        assert _transform_friends([" Buddy ", "", "  ", 7]) == ["Buddy", "7"]
+
     def test_transform_born_at_iso_format(self):
         """Test transforming ISO format datetime"""
         iso_date = "2020-01-15T10:30:00Z"
         result = _transform_born_at(iso_date)
         assert result == "2020-01-15T10:30:00+00:00"
 
-    def test_transform_born_at_various_formats(self):
+    @pytest.mark.parametrize(
+        "input_date",
+        ["2020-01-15 10:30:00", "2020/01/15 10:30:00", "01-15-2020 10:30:00"],
+    )
+    def test_transform_born_at_various_formats(self, input_date):
         """Test transforming various datetime formats"""
-        test_cases = [
-            ("2020-01-15 10:30:00", "2020-01-15T10:30:00"),
-            ("2020/01/15 10:30:00", "2020-01-15T10:30:00"),
-            ("01-15-2020 10:30:00", "2020-01-15T10:30:00"),
-        ]
-
-        for input_date, expected_prefix in test_cases:
-            result = _transform_born_at(input_date)
-            assert result.startswith(expected_prefix)
+        result = _transform_born_at(input_date)
+        assert result.startswith("2020-01-15T10:30:00")
+
+    def test_transform_born_at_epoch_milliseconds(self):
+        """Test transforming numeric epoch-millisecond timestamps"""
+        assert _transform_born_at(1640995200000) == "2022-01-01T00:00:00+00:00"
+        assert _transform_born_at(1579084200123) == "2020-01-15T10:30:00.123000+00:00"
+        assert _transform_born_at(-86400000) == "1969-12-31T00:00:00+00:00"
+
+    def test_transform_born_at_float_epoch_matches_datetime_rounding(self):
+        """Test float epochs round to microseconds exactly as datetime does"""
+        # Rounding born_at * 1000 directly would give .054802 here
+        assert _transform_born_at(1445387194054.8015) == (
+            "2015-10-21T00:26:34.054801+00:00"
+        )
+        assert _transform_born_at(1640995200000.0) == "2022-01-01T00:00:00+00:00"
+
+    @pytest.mark.parametrize(
+        "born_at",
+        [
+            253402300800000,  # 10000-01-01
+            10**15,
+            -62135596800001,  # Just before 0001-01-01
+            -(10**14),
+        ],
+    )
+    def test_transform_born_at_epoch_outside_year_range_unchanged(self, born_at):
+        """Test epochs outside years 1..9999 are passed through, not formatted"""
+        assert _transform_born_at(born_at) == born_at
+
+    def test_transform_born_at_unrepresentable_values_returned_unchanged(self):
+        """Test timestamps outside the datetime range are passed through"""
+        assert _transform_born_at(float("inf")) == float("inf")
+        assert _transform_born_at(10**20) == 10**20
+        assert _transform_born_at("0001-01-01T00:00:00+02:00") == (
+            "0001-01-01T00:00:00+02:00"
+        )
 
     def test_transform_born_at_invalid_format(self):
         """Test transforming invalid datetime format"""
@@ -98,56 +175,106 @@ class TestDataTransformer:
         # Should return original value if parsing fails
         assert result == invalid_date
 
-    def test_parse_datetime_string_valid_formats(self):
-        """Test parsing various valid datetime formats"""
-        valid_formats = [
+    @pytest.mark.parametrize(
+        "date_string",
+        [
             "2020-01-15T10:30:00Z",
             "2020-01-15 10:30:00",
             "2020/01/15 10:30:00",
             "01-15-2020 10:30:00",
-        ]
-
-        for date_string in valid_formats:
-            result = _parse_datetime_string(date_string)
-            assert result is not None
+        ],
+    )
+    def test_parse_datetime_string_valid_formats(self, date_string):
+        """Test parsing various valid datetime formats"""
+        assert _parse_datetime_string(date_string) is not None
+
+    def test_parse_datetime_string_rejects_out_of_range_fixed_layout(self):
+        """Test a well-shaped but impossible non-ISO date is not parsed"""
+        assert _parse_datetime_string("2020/13/45 10:30:00") is None
+        assert _parse_datetime_string("02-30-2020 10:30:00") is None
+
+    @pytest.mark.parametrize(
+        "date_string", ["2020/01/05 03:04:05\n", "01-05-2020 03:04:05\n"]
+    )
+    def test_parse_datetime_string_rejects_trailing_newline(self, date_string):
+        """Test the fixed-layout fast path is as strict as strptime"""
+        assert _parse_datetime_string(date_string) is None
+
+    def test_parse_datetime_string_unpadded_layout_falls_back(self):
+        """Test non-zero-padded layouts still parse through strptime"""
+        assert _parse_datetime_string("2020/1/5 10:30:00") == (
+            "2020-01-05T10:30:00+00:00"
+        )
+
+    @pytest.mark.parametrize(
+        "date_string,expected",
+        [
+            ("1-05-2020 03:04:05", "2020-01-05T03:04:05+00:00"),
+            ("1-5-2020 3:4:5", "2020-01-05T03:04:05+00:00"),
+            ("2020-1-5", "2020-01-05T00:00:00+00:00"),
+        ],
+    )
+    def test_parse_datetime_string_unpadded_fields(self, date_string, expected):
+        """Test unpadded fields that defeat the shape check still parse"""
+        assert _parse_datetime_string(date_string) == expected
+
+    def test_parse_datetime_string_converts_offset_to_utc(self):
+        """Test parsing a datetime with a non-UTC offset"""
+        result = _parse_datetime_string("2020-01-15T12:30:00+02:00")
+        assert result == "2020-01-15T10:30:00+00:00"
 
     def test_parse_datetime_string_invalid_format(self):
         """Test parsing invalid datetime format"""
         result = _parse_datetime_string("invalid-format")
         assert result is None
 
-    def test_chunk_list_normal_case(self):
-        """Test chunking list with normal parameters"""
-        data = list(range(10))  # [0, 1, 2, ..., 9]
-        chunks = chunk_list(data, 3)
-
-        expected_chunks = [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
-        assert chunks == expected_chunks
-
-    def test_chunk_list_exact_division(self):
-        """Test chunking list with exact division"""
-        data = list(range(6))  # [0, 1, 2, 3, 4, 5]
-        chunks = chunk_list(data, 3)
-
-        expected_chunks = [[0, 1, 2], [3, 4, 5]]
-        assert chunks == expected_chunks
-
-    def test_chunk_list_empty_list(self):
-        """Test chunking empty list"""
-        chunks = chunk_list([], 3)
-        assert chunks == []
-
-    def test_chunk_list_chunk_size_larger_than_list(self):
-        """Test chunking with chunk size larger than list"""
-        data = [1, 2, 3]
-        chunks = chunk_list(data, 10)
-        assert chunks == [[1, 2, 3]]
-
-    def test_chunk_list_chunk_size_one(self):
-        """Test chunking with chunk size of 1"""
-        data = [1, 2, 3]
-        chunks = chunk_list(data, 1)
-        assert chunks == [[1], [2], [3]]
+    def test_parse_datetime_string_repeat_hits_cache(self):
+        """Test a repeated born_at string is served from the parse cache"""
+        _parse_datetime_string("2020-03-04T05:06:07Z")
+        _parse_datetime_string("2020-03-04T05:06:07Z")
+
+        info = _parse_datetime_string.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+
+    def test_transform_friends_repeat_hits_cache(self):
+        """Test a repeated friends string is split once and copied per call"""
+        first = _transform_friends("Rex, Fido")
+        second = _transform_friends("Rex, Fido")
+
+        info = _split_friends.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+        assert first == second == ["Rex", "Fido"]
+        assert first is not second
+
+    @pytest.mark.parametrize(
+        "data,chunk_size,expected",
+        [
+            (list(range(10)), 3, [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]),
+            (list(range(6)), 3, [[0, 1, 2], [3, 4, 5]]),
+            ([], 3, []),
+            ([1, 2, 3], 10, [[1, 2, 3]]),
+            ([1, 2, 3], 1, [[1], [2], [3]]),
+        ],
+        ids=[
+            "normal_case",
+            "exact_division",
+            "empty_list",
+            "chunk_size_larger_than_list",
+            "chunk_size_one",
+        ],
+    )
+    def test_chunk_list(self, data, chunk_size, expected):
+        """Test chunking lists, including uneven and degenerate chunk sizes"""
+        assert chunk_list(data, chunk_size) == expected
+
+    def test_chunk_iter_is_lazy(self):
+        """Test chunk_iter consumes its input one chunk at a time"""
+        source = iter(range(7))
+        chunks = chunk_iter(source, 3)
+
+        assert next(chunks) == [0, 1, 2]
+        assert next(source) == 3  # The rest of the input is still unread
+        assert list(chunks) == [[4, 5, 6]]
 
 
 class TestAnimalTransformationEdgeCases:
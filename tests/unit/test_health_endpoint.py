@@ -2,16 +2,8 @@
 Unit tests for health endpoint.
 """
 
-import pytest
-from fastapi.testclient import TestClient
-
-from main import app
-
-
-@pytest.fixture
-def client():
-    """Create a test client"""
-    return TestClient(app)
+from datetime import datetime
+from unittest.mock import patch
 
 
 class TestHealthEndpoint:
@@ -41,3 +33,21 @@ class TestHealthEndpoint:
         assert isinstance(data["timestamp"], str)
         assert isinstance(data["version"], str)
         assert isinstance(data["service"], str)
+
+    def test_health_check_payload_reused_within_a_second(self, client):
+        """Test the serialized payload is rebuilt only when the second changes"""
+        with patch("app.api.endpoints.time.time", return_value=1_000_000.2):
+            first = client.get("/health")
+        with patch("app.api.endpoints.time.time", return_value=1_000_000.9):
+            second = client.get("/health")
+        with patch("app.api.endpoints.time.time", return_value=1_000_001.0):
+            third = client.get("/health")
+
+        assert second.content == first.content
+        assert third.content != first.content
+        assert (
+            first.json()["timestamp"] == datetime.fromtimestamp(1_000_000).isoformat()
+        )
+        assert (
+            third.json()["timestamp"] == datetime.fromtimestamp(1_000_001).isoformat()
+        )